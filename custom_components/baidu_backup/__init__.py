@@ -4,10 +4,13 @@ import os
 import asyncio
 import subprocess
 from datetime import datetime
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from .const import DOMAIN, STATUS_CHECKING, STATUS_UPLOADING, STATUS_SUCCESS, STATUS_FAILED, STATUS_ERROR, STATUS_MAP
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.helpers.start import async_at_started
+from .const import DOMAIN, STATUS_CHECKING, STATUS_UPLOADING, STATUS_SUCCESS, STATUS_FAILED, STATUS_ERROR, STATUS_MAP, CONF_HASH_WORKERS, DEFAULT_HASH_WORKERS
+from .hasher import BackupHasher
+from .sync import compare_backups, list_remote
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS = [Platform.SENSOR, Platform.BUTTON]
@@ -38,10 +41,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.error("检查百度云登录状态失败: %s", str(e))
         return False
 
+    hasher = BackupHasher(hass, entry.options.get(CONF_HASH_WORKERS, DEFAULT_HASH_WORKERS))
+    await hasher.async_load()
+
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "config": dict(entry.data),
-        "sensors": {}
+        "sensors": {},
+        "hasher": hasher
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -66,17 +73,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     async def check_sync_status(backup_dir: str) -> bool:
         """检查同步状态."""
         try:
-            result = subprocess.run(
-                ["nice", "-n", "19", "bypy", "compare", "HomeAssistant备份", backup_dir],
-                capture_output=True,
-                text=True
+            remote = await hass.async_add_executor_job(list_remote)
+            if remote is None:
+                return False
+            result = await hass.async_add_executor_job(
+                compare_backups, backup_dir, hasher.digests, remote
             )
-            
-            if result.returncode == 0:
-                output = result.stdout
-                if "Local only: 0" in output and "Remote only: 0" in output:
-                    return True
-            return False
+            return not any(result.values())
         except Exception as e:
             _LOGGER.error("检查同步状态失败: %s", str(e))
             return False
@@ -117,6 +120,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 _LOGGER.info("备份文件 %s 上传成功", backup_filename)
                 if status_sensor:
                     await status_sensor.async_set_status(STATUS_SUCCESS)
+                hass.async_create_background_task(
+                    hash_backups(backup_dir), f"{DOMAIN}_hash_backups"
+                )
             else:
                 _LOGGER.error("上传失败: %s", stderr.decode())
                 if status_sensor:
@@ -131,14 +137,66 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             if status_sensor:
                 await status_sensor.async_set_status(STATUS_ERROR)
 
+    async def hash_backups(backup_dir: str) -> None:
+        """计算所有尚未计算摘要的备份文件."""
+        try:
+            results = await hasher.async_hash_pending(backup_dir)
+            if results:
+                _LOGGER.info("已计算 %d 个备份文件的摘要", len(results))
+        except Exception as e:
+            _LOGGER.error("计算备份摘要失败: %s", str(e))
+
+    async def hash_pending(call: ServiceCall) -> ServiceResponse:
+        """计算备份目录中待处理文件的摘要，需要响应时等待完成并返回所有摘要."""
+        backup_dir = os.path.join(hass.config.config_dir, "backups")
+        if not os.path.exists(backup_dir):
+            _LOGGER.error("备份目录不存在")
+            return {"digests": {}} if call.return_response else None
+        if not call.return_response:
+            hass.async_create_background_task(
+                hash_backups(backup_dir), f"{DOMAIN}_hash_backups"
+            )
+            return None
+        await hash_backups(backup_dir)
+        return {"digests": hasher.digests}
+
+    async def hash_on_start(_hass: HomeAssistant) -> None:
+        """启动完成后计算停机期间积压的备份文件摘要."""
+        backup_dir = os.path.join(hass.config.config_dir, "backups")
+        if os.path.exists(backup_dir):
+            hass.async_create_background_task(
+                hash_backups(backup_dir), f"{DOMAIN}_hash_backups"
+            )
+
     hass.services.async_register(DOMAIN, "upload", upload_to_baidu)
+    hass.services.async_register(
+        DOMAIN, "hash", hash_pending, supports_response=SupportsResponse.OPTIONAL
+    )
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(async_at_started(hass, hash_on_start))
+
+    async def stop_hasher(event) -> None:
+        """Home Assistant 停止时终止正在运行的摘要计算."""
+        await hasher.async_shutdown()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, stop_hasher)
+    )
     
     return True
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """选项变更后重新加载配置项."""
+    # 授权更新同样会触发监听器，由选项流程自行重新加载
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if data and entry.options.get(CONF_HASH_WORKERS, DEFAULT_HASH_WORKERS) != data["hasher"].workers:
+        await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        await data["hasher"].async_shutdown()
     
     return unload_ok
\ No newline at end of file
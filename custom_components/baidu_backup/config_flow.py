@@ -5,6 +5,7 @@ import sys
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
+from .const import CONF_HASH_WORKERS, DEFAULT_HASH_WORKERS
 
 _LOGGER = logging.getLogger(__name__)
 DOMAIN = "baidu_backup"
@@ -119,7 +120,25 @@ class BaiduBackupOptionsFlow(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
-        return await self.async_step_auth()
+        return self.async_show_menu(
+            step_id="init",
+            menu_options=["auth", "hash"]
+        )
+
+    async def async_step_hash(self, user_input=None):
+        """Handle hashing options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="hash",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_HASH_WORKERS,
+                    default=self.config_entry.options.get(CONF_HASH_WORKERS, DEFAULT_HASH_WORKERS)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+            }),
+        )
 
     async def async_step_auth(self, user_input=None):
         """Handle authorization options."""
@@ -143,10 +162,11 @@ class BaiduBackupOptionsFlow(config_entries.OptionsFlow):
                         data={"token": user_input["token"]}
                     )
                     
-                    # 重新加载集成
+                    # 重新加载集成（登录失败时不会注册更新监听器）
                     await self.hass.config_entries.async_reload(self.config_entry.entry_id)
                     
-                    return self.async_create_entry(title="", data={})
+                    # 保留已有选项
+                    return self.async_create_entry(title="", data=dict(self.config_entry.options))
                 else:
                     errors["base"] = "invalid_token"
             
@@ -1,10 +1,19 @@
 """Constants for baidu_backup."""
+import os
 from datetime import timedelta
 
 DOMAIN = "baidu_backup"
 SCAN_INTERVAL = timedelta(minutes=1)
 DEFAULT_NAME = "百度云盘"
 
+# 摘要计算
+CONF_HASH_WORKERS = "hash_workers"
+DEFAULT_HASH_WORKERS = min(4, os.cpu_count() or 1)
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+HASH_SLICE_SIZE = 256 * 1024
+HASH_STORAGE_KEY = f"{DOMAIN}.digests"
+HASH_STORAGE_VERSION = 1
+
 # 状态
 STATUS_IDLE = "idle"
 STATUS_CHECKING = "checking"
@@ -0,0 +1,36 @@
+"""百度云备份文件摘要计算的工作进程脚本.
+
+由集成以 `python digest.py <块大小> <分片大小> <文件路径>` 的方式独立运行，
+只依赖标准库，不会导入集成包或 Home Assistant。结果以 JSON 输出到标准输出。
+"""
+import hashlib
+import json
+import sys
+import zlib
+
+def compute_digests(path: str, chunk_size: int, slice_size: int) -> dict:
+    """流式读取文件，计算 MD5、分片 MD5 和 CRC32."""
+    md5 = hashlib.md5()
+    slice_md5 = hashlib.md5()
+    crc32 = 0
+    read = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            md5.update(chunk)
+            crc32 = zlib.crc32(chunk, crc32)
+            # 百度云的分片 MD5 只取文件开头的一段
+            if read < slice_size:
+                slice_md5.update(chunk[:slice_size - read])
+            read += len(chunk)
+    return {
+        "md5": md5.hexdigest(),
+        "slice_md5": slice_md5.hexdigest(),
+        "crc32": format(crc32 & 0xFFFFFFFF, "08x"),
+    }
+
+if __name__ == "__main__":
+    chunk_size, slice_size, path = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+    json.dump(compute_digests(path, chunk_size, slice_size), sys.stdout)
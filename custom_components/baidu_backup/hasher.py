@@ -0,0 +1,172 @@
+"""百度云备份文件摘要计算."""
+import asyncio
+import json
+import logging
+import os
+import sys
+from contextlib import suppress
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from .const import HASH_CHUNK_SIZE, HASH_SLICE_SIZE, HASH_STORAGE_KEY, HASH_STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+# 工作进程直接运行该脚本，不导入集成包
+DIGEST_SCRIPT = os.path.join(os.path.dirname(__file__), "digest.py")
+
+def stat_backups(backup_dir: str) -> dict:
+    """列出备份目录中的 tar 文件及其大小和修改时间."""
+    files = {}
+    for name in os.listdir(backup_dir):
+        if not name.endswith('.tar'):
+            continue
+        path = os.path.join(backup_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # 备份保留策略可能在列出目录后删除旧文件
+            continue
+        files[path] = (stat.st_size, stat.st_mtime)
+    return files
+
+class BackupHasher:
+    """用数量有限的独立工作进程计算备份文件摘要，结果持久化保存."""
+
+    def __init__(self, hass: HomeAssistant, workers: int) -> None:
+        """Initialize the hasher."""
+        self.hass = hass
+        self.workers = max(1, workers)
+        self._store = Store(hass, HASH_STORAGE_VERSION, HASH_STORAGE_KEY)
+        self._digests = {}
+        self._pending = {}
+        self._procs = set()
+        self._semaphore = asyncio.Semaphore(self.workers)
+        self._batches = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closed = False
+
+    async def async_load(self) -> None:
+        """加载已保存的摘要."""
+        data = await self._store.async_load()
+        if data:
+            self._digests = data
+
+    @property
+    def digests(self) -> dict:
+        """返回所有已计算的摘要，以文件路径为键.
+
+        传感器会在线程中读取，先整体复制一份再遍历。
+        """
+        entries = dict(self._digests)
+        return {path: entry["digests"] for path, entry in entries.items()}
+
+    async def async_hash_pending(self, backup_dir: str) -> dict:
+        """计算备份目录中所有尚未计算摘要的文件."""
+        if self._closed:
+            return {}
+
+        self._batches += 1
+        self._idle.clear()
+        try:
+            return await self._async_hash_batch(backup_dir)
+        finally:
+            self._batches -= 1
+            if not self._batches:
+                self._idle.set()
+
+    async def async_shutdown(self) -> None:
+        """终止正在运行的工作进程，等待批次结束后最后保存一次."""
+        if self._closed:
+            await self._idle.wait()
+            return
+
+        self._closed = True
+        for proc in list(self._procs):
+            with suppress(ProcessLookupError):
+                proc.kill()
+        await self._idle.wait()
+        await self._store.async_save(self._digests)
+
+    async def _async_hash_batch(self, backup_dir: str) -> dict:
+        """计算一个批次，关闭后不再保存."""
+        files = await self.hass.async_add_executor_job(stat_backups, backup_dir)
+
+        # 删除已不存在的文件的记录
+        for path in list(self._digests):
+            if path not in files:
+                self._digests.pop(path)
+
+        paths = [
+            path for path, (size, mtime) in files.items()
+            if not self._is_current(path, size, mtime)
+        ]
+        if not paths or self._closed:
+            return {}
+
+        _LOGGER.info("开始计算 %d 个备份文件的摘要 (%d 个进程)", len(paths), self.workers)
+        results = await asyncio.gather(
+            *(self._async_hash(path, *files[path]) for path in paths),
+            return_exceptions=True,
+        )
+
+        done = {}
+        for path, result in zip(paths, results):
+            # CancelledError 不是 Exception 的子类，被取消的文件同样不算完成
+            if isinstance(result, BaseException):
+                _LOGGER.error("计算摘要失败 %s: %r", path, result)
+            else:
+                done[path] = result
+
+        # 关闭后由 async_shutdown 统一保存，避免覆盖新实例保存的数据
+        if not self._closed:
+            await self._store.async_save(self._digests)
+        return done
+
+    def _is_current(self, path: str, size: int, mtime: float) -> bool:
+        """判断已保存的摘要是否仍与文件一致."""
+        entry = self._digests.get(path)
+        return entry is not None and entry["size"] == size and entry["mtime"] == mtime
+
+    async def _async_hash(self, path: str, size: int, mtime: float) -> dict:
+        """计算单个文件的摘要，同一文件同时只计算一次."""
+        task = self._pending.get(path)
+        if task is None:
+            task = self.hass.async_create_task(self._async_run_worker(path))
+            self._pending[path] = task
+            task.add_done_callback(lambda _: self._pending.pop(path, None))
+
+        digests = await task
+        self._digests[path] = {"size": size, "mtime": mtime, "digests": digests}
+        _LOGGER.debug("备份文件 %s 摘要: %s", path, digests)
+        return digests
+
+    async def _async_run_worker(self, path: str) -> dict:
+        """在独立的低优先级进程中计算摘要，同时运行的进程数不超过 workers."""
+        async with self._semaphore:
+            if self._closed:
+                raise RuntimeError("摘要计算已停止")
+
+            process = await asyncio.create_subprocess_exec(
+                "nice", "-n", "19",
+                "ionice", "-c", "2", "-n", "7",
+                sys.executable, DIGEST_SCRIPT,
+                str(HASH_CHUNK_SIZE), str(HASH_SLICE_SIZE), path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            self._procs.add(process)
+            try:
+                stdout, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                with suppress(ProcessLookupError):
+                    process.kill()
+                await process.wait()
+                raise
+            finally:
+                self._procs.discard(process)
+
+        # 进程被终止（如内存不足或关闭时）返回非零退出码
+        if process.returncode != 0:
+            raise RuntimeError(f"工作进程退出码 {process.returncode}: {stderr.decode().strip()}")
+        return json.loads(stdout)
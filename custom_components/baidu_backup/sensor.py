@@ -1,7 +1,6 @@
 """百度云备份传感器."""
 import logging
 import subprocess
-from datetime import datetime
 import pytz
 import os
 from homeassistant.components.sensor import SensorEntity
@@ -21,6 +20,7 @@ from .const import (
     STATUS_ERROR,
 )
 from .entity import BaiduBackupEntity
+from .sync import compare_backups, list_remote
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,13 +30,14 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the 百度云备份 sensors."""
-    status_sensor = BaiduStatusSensor(hass)
+    hasher = hass.data[DOMAIN][config_entry.entry_id]["hasher"]
+    status_sensor = BaiduStatusSensor(hass, hasher)
     hass.data[DOMAIN][config_entry.entry_id]["sensors"]["status_sensor"] = status_sensor
     
     async_add_entities([
         BaiduQuotaSensor(),
         BaiduUsedSpaceSensor(),
-        BaiduLastUploadSensor(hass),
+        BaiduLastUploadSensor(hass, hasher),
         status_sensor
     ], True)
 
@@ -101,10 +102,11 @@ class BaiduUsedSpaceSensor(BaiduBackupEntity, SensorEntity):
 class BaiduLastUploadSensor(BaiduBackupEntity, SensorEntity):
     """最后上传时间传感器."""
 
-    def __init__(self, hass):
+    def __init__(self, hass, hasher):
         """Initialize the sensor."""
         super().__init__("last_upload")
         self.hass = hass
+        self.hasher = hasher
         self._attr_name = "最后上传时间"
         self._attr_device_class = "timestamp"
         self._attr_icon = "mdi:clock-check"
@@ -113,59 +115,21 @@ class BaiduLastUploadSensor(BaiduBackupEntity, SensorEntity):
         """更新上传时间."""
         try:
             backup_dir = os.path.join(self.hass.config.config_dir, "backups")
-            result = subprocess.run(
-                ["nice", "-n", "19", "bypy", "compare", "HomeAssistant备份", backup_dir],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                output = result.stdout
-                local_only = 0
-                remote_only = 0
-                
-                for line in output.split('\n'):
-                    if "Local only:" in line:
-                        local_only = int(line.split(':')[1].strip())
-                    elif "Remote only:" in line:
-                        remote_only = int(line.split(':')[1].strip())
-                
-                # 如果本地和远程文件数量相同，说明同步完成
-                if local_only == 0:
-                    # 获取最新的远程文件时间
-                    list_result = subprocess.run(
-                        ["nice", "-n", "19", "bypy", "list", "HomeAssistant备份"],
-                        capture_output=True,
-                        text=True
-                    )
-                    
-                    if list_result.returncode == 0:
-                        list_output = list_result.stdout
-                        latest_time = None
-                        
-                        for line in list_output.split('\n'):
-                            if '.tar' in line:  # 只处理备份文件
-                                parts = line.split()
-                                date_str = None
-                                time_str = None
-                                
-                                for part in parts:
-                                    if part.startswith("202"):  # 查找日期
-                                        date_str = part.rstrip(',')
-                                    elif ":" in part:  # 查找时间
-                                        time_str = part
-                                
-                                if date_str and time_str:
-                                    datetime_str = f"{date_str} {time_str}"
-                                    current_time = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S")
-                                    if latest_time is None or current_time > latest_time:
-                                        latest_time = current_time
-                        
-                        if latest_time:
-                            latest_time = latest_time.replace(tzinfo=pytz.UTC)
-                            local_tz = pytz.timezone('Asia/Shanghai')
-                            local_time = latest_time.astimezone(local_tz)
-                            self._attr_native_value = local_time
+            remote = list_remote()
+            if remote is None:
+                return
+
+            # 使用已保存的本地摘要比较，不再每次运行 bypy compare 重新哈希
+            result = compare_backups(backup_dir, self.hasher.digests, remote)
+
+            # 如果本地文件都已在远程，说明同步完成
+            if result["local_only"] == 0:
+                times = [item["mtime"] for item in remote.values() if item["mtime"]]
+                if times:
+                    latest_time = max(times).replace(tzinfo=pytz.UTC)
+                    local_tz = pytz.timezone('Asia/Shanghai')
+                    local_time = latest_time.astimezone(local_tz)
+                    self._attr_native_value = local_time
                 
         except Exception as e:
             _LOGGER.error("更新上传时间失败: %s", str(e))
@@ -173,10 +137,11 @@ class BaiduLastUploadSensor(BaiduBackupEntity, SensorEntity):
 class BaiduStatusSensor(BaiduBackupEntity, SensorEntity):
     """备份状态传感器."""
 
-    def __init__(self, hass):
+    def __init__(self, hass, hasher):
         """Initialize the sensor."""
         super().__init__("status")
         self.hass = hass
+        self.hasher = hasher
         self._attr_name = "状态"
         self._attr_native_value = STATUS_IDLE
         self._attr_extra_state_attributes = {"说明": STATUS_MAP[STATUS_IDLE]}
@@ -219,22 +184,11 @@ class BaiduStatusSensor(BaiduBackupEntity, SensorEntity):
             # 只在上传状态下检查同步状态
             if self._is_uploading:
                 backup_dir = os.path.join(self.hass.config.config_dir, "backups")
-                result = subprocess.run(
-                    ["nice", "-n", "19", "bypy", "compare", "HomeAssistant备份", backup_dir],
-                    capture_output=True,
-                    text=True
-                )
+                remote = list_remote()
                 
-                if result.returncode == 0:
-                    output = result.stdout
-                    local_only = 0
-                    for line in output.split('\n'):
-                        if "Local only:" in line:
-                            try:
-                                local_only = int(line.split(':')[1].strip())
-                                break
-                            except (ValueError, IndexError):
-                                continue
+                if remote is not None:
+                    result = compare_backups(backup_dir, self.hasher.digests, remote)
+                    local_only = result["local_only"]
                     
                     # 第一次检查，记录初始值
                     if self._last_local_only is None:
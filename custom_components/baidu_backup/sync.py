@@ -0,0 +1,60 @@
+"""百度云备份同步状态检查."""
+import logging
+import os
+import subprocess
+from datetime import datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+def list_remote():
+    """列出百度云中的备份文件，返回 {文件名: {"md5", "mtime"}}，失败时返回 None."""
+    result = subprocess.run(
+        ["nice", "-n", "19", "bypy", "list", "HomeAssistant备份"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        _LOGGER.error("列出远程备份失败: %s", result.stderr)
+        return None
+
+    remote = {}
+    for line in result.stdout.split('\n'):
+        parts = line.split()
+        # 格式: F 文件名 大小 日期, 时间 MD5
+        if len(parts) < 2 or parts[0] != "F" or not parts[1].endswith('.tar'):
+            continue
+        date_str = None
+        time_str = None
+        for part in parts[2:]:
+            if part.startswith("20"):  # 查找日期
+                date_str = part.rstrip(',')
+            elif ":" in part:  # 查找时间
+                time_str = part
+        mtime = None
+        if date_str and time_str:
+            mtime = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S")
+        md5 = parts[-1].lower() if len(parts[-1]) == 32 else None
+        remote[parts[1]] = {"md5": md5, "mtime": mtime}
+    return remote
+
+def compare_backups(backup_dir: str, digests: dict, remote: dict) -> dict:
+    """用已保存的本地摘要与远程 MD5 比较，代替逐个哈希的 bypy compare.
+
+    尚未计算摘要的本地文件只按文件名比较。
+    """
+    local = [f for f in os.listdir(backup_dir) if f.endswith('.tar')]
+    local_only = 0
+    different = 0
+    for name in local:
+        if name not in remote:
+            local_only += 1
+            continue
+        entry = digests.get(os.path.join(backup_dir, name))
+        remote_md5 = remote[name]["md5"]
+        if entry and remote_md5 and entry["md5"] != remote_md5:
+            different += 1
+    return {
+        "local_only": local_only,
+        "remote_only": len(set(remote) - set(local)),
+        "different": different,
+    }